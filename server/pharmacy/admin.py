@@ -1,12 +1,27 @@
 # pharmacy/admin.py
 from django.contrib import admin
-from django.utils.html import format_html
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db.models import BooleanField, Case, Count, F, Q, Value, When
+from django.utils import timezone
+from django.utils.safestring import mark_safe
 from .models import (
-    Category, Manufacturer, Medicine, MedicineAlias, 
+    Category, Manufacturer, Symptom, Medicine, MedicineAlias, 
     Pharmacy, PharmacyInventory, Customer, Order, OrderItem,
     WhatsAppSession
 )
 
+class ChangelistDeferMixin:
+    """Defer large text columns on the changelist, where they are never shown"""
+    changelist_defer = ()
+    
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        resolver_match = request.resolver_match
+        if (self.changelist_defer and resolver_match
+                and resolver_match.url_name.endswith('_changelist')):
+            queryset = queryset.defer(*self.changelist_defer)
+        return queryset
+
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
     list_display = ['name', 'description', 'created_at']
@@ -20,12 +35,21 @@ class ManufacturerAdmin(admin.ModelAdmin):
     list_filter = ['country', 'created_at']
     list_per_page = 20
 
+@admin.register(Symptom)
+class SymptomAdmin(admin.ModelAdmin):
+    list_display = ['name']
+    search_fields = ['name']
+    list_per_page = 20
+
 class MedicineAliasInline(admin.TabularInline):
     model = MedicineAlias
     extra = 1
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('medicine')
 
 @admin.register(Medicine)
-class MedicineAdmin(admin.ModelAdmin):
+class MedicineAdmin(ChangelistDeferMixin, admin.ModelAdmin):
     list_display = [
         'name', 'generic_name', 'strength', 'form', 'category', 
         'manufacturer', 'mrp', 'selling_price_display', 'discount_percentage', 'prescription_type', 
@@ -35,11 +59,13 @@ class MedicineAdmin(admin.ModelAdmin):
         'category', 'manufacturer', 'form', 'prescription_type', 
         'is_active', 'is_in_stock', 'created_at'
     ]
-    search_fields = ['name', 'generic_name', 'brand_name', 'composition']
+    search_fields = ['name', 'generic_name', 'brand_name']
     readonly_fields = ['created_at', 'updated_at', 'selling_price_display']
     list_editable = ['is_active', 'is_in_stock', 'mrp', 'discount_percentage']
     list_per_page = 25
+    changelist_defer = ['composition', 'indication', 'dosage', 'side_effects', 'contraindications']
     inlines = [MedicineAliasInline]
+    filter_horizontal = ['symptoms']
     
     fieldsets = (
         ('Basic Information', {
@@ -49,7 +75,7 @@ class MedicineAdmin(admin.ModelAdmin):
             'fields': ('composition', 'strength', 'form', 'pack_size', 'prescription_type')
         }),
         ('Usage Information', {
-            'fields': ('indication', 'dosage', 'side_effects', 'contraindications'),
+            'fields': ('indication', 'symptoms', 'dosage', 'side_effects', 'contraindications'),
             'classes': ('collapse',)
         }),
         ('Pricing', {
@@ -64,9 +90,30 @@ class MedicineAdmin(admin.ModelAdmin):
         })
     )
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('category', 'manufacturer')
+    
+    def get_search_results(self, request, queryset, search_term):
+        """Match names through the trigram indexes and rank by similarity"""
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        
+        queryset = queryset.filter(
+            Q(name__icontains=search_term) |
+            Q(generic_name__icontains=search_term) |
+            Q(brand_name__icontains=search_term) |
+            Q(name__trigram_similar=search_term)
+        ).annotate(
+            search_similarity=TrigramSimilarity('name', search_term)
+            + TrigramSimilarity('generic_name', search_term) * 0.5
+        ).order_by('-search_similarity')
+        return queryset, False
+    
     def selling_price_display(self, obj):
         return f"₹{obj.selling_price:.2f}"
     selling_price_display.short_description = "Selling Price"
+    selling_price_display.admin_order_field = 'selling_price'
 
 @admin.register(Pharmacy)
 class PharmacyAdmin(admin.ModelAdmin):
@@ -97,6 +144,11 @@ class PharmacyAdmin(admin.ModelAdmin):
         })
     )
 
+# Constant status badges, built once instead of through format_html per row
+_YES_RED = mark_safe('<span style="color: red;">Yes</span>')
+_YES_ORANGE = mark_safe('<span style="color: orange;">Yes</span>')
+_NO_GREEN = mark_safe('<span style="color: green;">No</span>')
+
 @admin.register(PharmacyInventory)
 class PharmacyInventoryAdmin(admin.ModelAdmin):
     list_display = [
@@ -112,21 +164,35 @@ class PharmacyInventoryAdmin(admin.ModelAdmin):
     list_editable = ['stock_quantity', 'reorder_level']
     readonly_fields = ['is_expired', 'needs_reorder', 'created_at', 'updated_at']
     list_per_page = 30
+    list_select_related = ['pharmacy', 'medicine', 'medicine__category']
+    raw_id_fields = ['pharmacy', 'medicine']
+    
+    def get_queryset(self, request):
+        # Evaluate the expiry and reorder flags once in SQL for the whole page
+        today = timezone.now().date()
+        return super().get_queryset(request).annotate(
+            _is_expired=Case(
+                When(expiry_date__lt=today, then=Value(True)),
+                default=Value(False), output_field=BooleanField()
+            ),
+            _needs_reorder=Case(
+                When(stock_quantity__lte=F('reorder_level'), then=Value(True)),
+                default=Value(False), output_field=BooleanField()
+            ),
+        )
     
     def is_expired(self, obj):
-        if obj.is_expired:
-            return format_html('<span style="color: red;">Yes</span>')
-        return format_html('<span style="color: green;">No</span>')
+        return _YES_RED if obj._is_expired else _NO_GREEN
     is_expired.short_description = "Expired"
+    is_expired.admin_order_field = '_is_expired'
     
     def needs_reorder(self, obj):
-        if obj.needs_reorder:
-            return format_html('<span style="color: orange;">Yes</span>')
-        return format_html('<span style="color: green;">No</span>')
+        return _YES_ORANGE if obj._needs_reorder else _NO_GREEN
     needs_reorder.short_description = "Needs Reorder"
+    needs_reorder.admin_order_field = '_needs_reorder'
 
 @admin.register(Customer)
-class CustomerAdmin(admin.ModelAdmin):
+class CustomerAdmin(ChangelistDeferMixin, admin.ModelAdmin):
     list_display = [
         'name', 'phone_number', 'whatsapp_number', 'email',
         'city', 'pincode', 'preferred_pharmacy', 'created_at'
@@ -134,16 +200,22 @@ class CustomerAdmin(admin.ModelAdmin):
     list_filter = ['city', 'preferred_pharmacy', 'created_at']
     search_fields = ['name', 'phone_number', 'email']
     list_per_page = 25
+    list_select_related = ['preferred_pharmacy']
+    raw_id_fields = ['preferred_pharmacy']
+    changelist_defer = ['address']
 
 class OrderItemInline(admin.TabularInline):
     model = OrderItem
     readonly_fields = ['total_price']
     extra = 0
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('medicine')
 
 @admin.register(Order)
-class OrderAdmin(admin.ModelAdmin):
+class OrderAdmin(ChangelistDeferMixin, admin.ModelAdmin):
     list_display = [
-        'order_id_short', 'customer', 'pharmacy', 'status',
+        'order_id_short', 'customer', 'pharmacy', 'status', 'items_count',
         'total_amount', 'prescription_required', 'created_at'
     ]
     list_filter = [
@@ -157,6 +229,9 @@ class OrderAdmin(admin.ModelAdmin):
     ]
     list_editable = ['status']
     list_per_page = 20
+    list_select_related = ['customer', 'pharmacy']
+    raw_id_fields = ['customer', 'pharmacy']
+    changelist_defer = ['notes', 'delivery_address']
     inlines = [OrderItemInline]
     
     fieldsets = (
@@ -179,9 +254,17 @@ class OrderAdmin(admin.ModelAdmin):
         })
     )
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(_items_count=Count('items'))
+    
     def order_id_short(self, obj):
         return str(obj.order_id)[:8] + "..."
     order_id_short.short_description = "Order ID"
+    
+    def items_count(self, obj):
+        return obj._items_count
+    items_count.short_description = "Items"
+    items_count.admin_order_field = '_items_count'
 
 @admin.register(WhatsAppSession)
 class WhatsAppSessionAdmin(admin.ModelAdmin):
@@ -0,0 +1,49 @@
+# pharmacy/caching.py
+import time
+
+from django.core.cache import cache
+from rest_framework.response import Response
+
+# Catalogue responses (categories, manufacturers, medicine details, symptom
+# suggestions) are cached under a version number that signals.py replaces
+# whenever a Category, Manufacturer, Medicine, MedicineAlias or Symptom is
+# saved or deleted, or a medicine's symptoms change
+CATALOG_CACHE_TIMEOUT = 60 * 60
+CATALOG_VERSION_KEY = 'catalog:version'
+
+def catalog_version():
+    """Return the current catalogue version"""
+    return cache.get_or_set(CATALOG_VERSION_KEY, time.time_ns, None)
+
+def catalog_cache_key(name):
+    """Build a cache key that is abandoned as soon as the catalogue changes"""
+    return f'catalog:{catalog_version()}:{name}'
+
+def invalidate_catalog():
+    """Orphan every cached catalogue response by moving to a new version"""
+    cache.set(CATALOG_VERSION_KEY, time.time_ns(), None)
+
+class CachedListMixin:
+    """Serve a list view's response data from the catalogue cache"""
+    cache_name = None
+    
+    def list(self, request, *args, **kwargs):
+        key = catalog_cache_key(f'{self.cache_name}:{request.get_full_path()}')
+        data = cache.get(key)
+        if data is None:
+            data = super().list(request, *args, **kwargs).data
+            cache.set(key, data, CATALOG_CACHE_TIMEOUT)
+        return Response(data)
+
+class CachedRetrieveMixin:
+    """Serve a detail view's response data from the catalogue cache, keyed by lookup value"""
+    cache_name = None
+    
+    def retrieve(self, request, *args, **kwargs):
+        lookup = kwargs[self.lookup_url_kwarg or self.lookup_field]
+        key = catalog_cache_key(f'{self.cache_name}:{lookup}')
+        data = cache.get(key)
+        if data is None:
+            data = super().retrieve(request, *args, **kwargs).data
+            cache.set(key, data, CATALOG_CACHE_TIMEOUT)
+        return Response(data)
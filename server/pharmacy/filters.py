@@ -0,0 +1,31 @@
+# pharmacy/filters.py
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F
+from rest_framework import filters
+from rest_framework.settings import api_settings
+
+class FullTextSearchFilter(filters.BaseFilterBackend):
+    """Search the weighted Medicine.search_vector column and rank by relevance
+
+    Takes the same ?search= parameter as DRF's SearchFilter. Every word must
+    match the start of a word in the name, generic name, brand or
+    composition, so partially typed names still find results. Results are
+    ranked unless the client asks for an explicit ?ordering=.
+    """
+    search_param = api_settings.SEARCH_PARAM
+    
+    def filter_queryset(self, request, queryset, view):
+        words = re.findall(r'\w+', request.query_params.get(self.search_param, ''))
+        if not words:
+            return queryset
+        
+        query = SearchQuery(' & '.join(f'{word}:*' for word in words), config='simple', search_type='raw')
+        queryset = queryset.filter(search_vector=query)
+        if api_settings.ORDERING_PARAM in request.query_params:
+            return queryset
+        
+        return queryset.annotate(
+            search_rank=SearchRank(F('search_vector'), query)
+        ).order_by('-search_rank', *queryset.query.order_by)
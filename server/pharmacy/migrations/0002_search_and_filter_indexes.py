@@ -0,0 +1,52 @@
+# Generated by Django 5.2.3 on 2026-10-15 09:12
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pharmacy', '0001_initial'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['city'], name='pharmacy_cu_city_f04bb5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='medicine',
+            index=models.Index(fields=['brand_name'], name='pharmacy_me_brand_n_d2eca4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='medicine',
+            index=models.Index(fields=['is_active', 'is_in_stock'], name='pharmacy_me_is_acti_0eb09e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='medicine',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='med_name_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='medicine',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['generic_name'], name='med_generic_name_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='medicine',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['composition'], name='med_composition_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['status', 'created_at'], name='pharmacy_or_status_1ea00d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pharmacyinventory',
+            index=models.Index(fields=['expiry_date'], name='pharmacy_ph_expiry__5ec868_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='whatsappsession',
+            index=models.Index(fields=['phone_number', 'last_activity'], name='pharmacy_wh_phone_n_6e254f_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.3 on 2026-10-15 09:40
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pharmacy', '0002_search_and_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='medicine',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['brand_name'], name='med_brand_name_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='pharmacy',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='pharmacy_name_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='pharmacy',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['city'], name='pharmacy_city_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
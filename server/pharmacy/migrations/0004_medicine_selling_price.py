@@ -0,0 +1,28 @@
+# Generated by Django 5.2.3 on 2026-10-15 10:05
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_selling_price(apps, schema_editor):
+    Medicine = apps.get_model('pharmacy', 'Medicine')
+    Medicine.objects.update(
+        selling_price=F('mrp') - (F('mrp') * F('discount_percentage') / 100)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pharmacy', '0003_trigram_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='medicine',
+            name='selling_price',
+            field=models.DecimalField(db_index=True, decimal_places=2, default=0, editable=False, max_digits=10),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_selling_price, migrations.RunPython.noop),
+    ]
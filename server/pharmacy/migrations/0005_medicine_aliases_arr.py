@@ -0,0 +1,35 @@
+# Generated by Django 5.2.3 on 2026-10-15 11:20
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.contrib.postgres.expressions import ArraySubquery
+from django.db import migrations, models
+from django.db.models import OuterRef
+
+
+def copy_aliases(apps, schema_editor):
+    Medicine = apps.get_model('pharmacy', 'Medicine')
+    MedicineAlias = apps.get_model('pharmacy', 'MedicineAlias')
+    Medicine.objects.update(aliases_arr=ArraySubquery(
+        MedicineAlias.objects.filter(medicine=OuterRef('pk')).order_by('pk').values('alias')
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pharmacy', '0004_medicine_selling_price'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='medicine',
+            name='aliases_arr',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=200), blank=True, default=list, editable=False, size=None),
+        ),
+        migrations.AddIndex(
+            model_name='medicine',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['aliases_arr'], name='med_aliases_arr_gin'),
+        ),
+        migrations.RunPython(copy_aliases, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.3 on 2026-10-15 11:55
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('pharmacy', '0005_medicine_aliases_arr'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='medicinealias',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['alias'], name='medicinealias_alias_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.3 on 2026-10-15 12:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pharmacy', '0006_medicinealias_alias_trgm'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='medicine',
+            index=models.Index(fields=['is_active', 'category', 'name'], name='pharmacy_me_is_acti_86103b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='medicine',
+            index=models.Index(fields=['is_active', 'prescription_type', 'is_in_stock'], name='pharmacy_me_is_acti_ec0722_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['customer', '-created_at'], name='pharmacy_or_custome_4fe379_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pharmacy',
+            index=models.Index(fields=['is_active', 'pincode'], name='pharmacy_ph_is_acti_3e5f0d_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.3 on 2026-10-15 13:10
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pharmacy', '0007_list_view_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='medicine',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='medicine',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='med_search_vector_gin'),
+        ),
+        migrations.RunSQL(
+            sql="""
+                CREATE TRIGGER pharmacy_medicine_search_vector_update
+                BEFORE INSERT OR UPDATE ON pharmacy_medicine
+                FOR EACH ROW EXECUTE FUNCTION
+                tsvector_update_trigger(search_vector, 'pg_catalog.simple', name, generic_name, composition);
+
+                UPDATE pharmacy_medicine SET search_vector = to_tsvector(
+                    'pg_catalog.simple',
+                    coalesce(name, '') || ' ' || coalesce(generic_name, '') || ' ' || coalesce(composition, '')
+                );
+            """,
+            reverse_sql="""
+                DROP TRIGGER IF EXISTS pharmacy_medicine_search_vector_update ON pharmacy_medicine;
+            """,
+        ),
+    ]
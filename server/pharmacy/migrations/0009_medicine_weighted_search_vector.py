@@ -0,0 +1,45 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pharmacy', '0008_medicine_search_vector'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="""
+                CREATE FUNCTION pharmacy_medicine_search_vector() RETURNS trigger AS $$
+                BEGIN
+                    NEW.search_vector :=
+                        setweight(to_tsvector('pg_catalog.simple', coalesce(NEW.name, '')), 'A') ||
+                        setweight(to_tsvector('pg_catalog.simple', coalesce(NEW.generic_name, '')), 'B') ||
+                        setweight(to_tsvector('pg_catalog.simple', coalesce(NEW.brand_name, '')), 'C') ||
+                        setweight(to_tsvector('pg_catalog.simple', coalesce(NEW.composition, '')), 'D');
+                    RETURN NEW;
+                END
+                $$ LANGUAGE plpgsql;
+
+                DROP TRIGGER IF EXISTS pharmacy_medicine_search_vector_update ON pharmacy_medicine;
+                CREATE TRIGGER pharmacy_medicine_search_vector_update
+                BEFORE INSERT OR UPDATE OF name, generic_name, brand_name, composition ON pharmacy_medicine
+                FOR EACH ROW EXECUTE FUNCTION pharmacy_medicine_search_vector();
+
+                UPDATE pharmacy_medicine SET
+                    search_vector =
+                        setweight(to_tsvector('pg_catalog.simple', coalesce(name, '')), 'A') ||
+                        setweight(to_tsvector('pg_catalog.simple', coalesce(generic_name, '')), 'B') ||
+                        setweight(to_tsvector('pg_catalog.simple', coalesce(brand_name, '')), 'C') ||
+                        setweight(to_tsvector('pg_catalog.simple', coalesce(composition, '')), 'D');
+            """,
+            reverse_sql="""
+                DROP TRIGGER IF EXISTS pharmacy_medicine_search_vector_update ON pharmacy_medicine;
+                DROP FUNCTION IF EXISTS pharmacy_medicine_search_vector();
+                CREATE TRIGGER pharmacy_medicine_search_vector_update
+                BEFORE INSERT OR UPDATE ON pharmacy_medicine
+                FOR EACH ROW EXECUTE FUNCTION
+                tsvector_update_trigger(search_vector, 'pg_catalog.simple', name, generic_name, composition);
+            """,
+        ),
+    ]
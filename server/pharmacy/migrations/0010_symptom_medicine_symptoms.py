@@ -0,0 +1,53 @@
+# Generated by Django 5.2.3 on 2026-10-15 16:40
+
+from django.contrib.postgres.search import SearchQuery
+from django.db import migrations, models
+
+# The keyword table medicine_suggestions matched at request time before
+# symptoms were stored; each condition is linked to the medicines it matched
+SYMPTOM_KEYWORDS = {
+    'headache': ('paracetamol', 'aspirin', 'ibuprofen'),
+    'fever': ('paracetamol', 'panadol', 'crocin'),
+    'cold': ('cetirizine', 'phenylephrine', 'paracetamol'),
+    'cough': ('dextromethorphan', 'ambroxol', 'salbutamol'),
+    'acidity': ('omeprazole', 'pantoprazole', 'ranitidine'),
+    'pain': ('ibuprofen', 'diclofenac', 'paracetamol'),
+}
+
+
+def seed_symptoms(apps, schema_editor):
+    Symptom = apps.get_model('pharmacy', 'Symptom')
+    Medicine = apps.get_model('pharmacy', 'Medicine')
+    MedicineSymptom = Medicine.symptoms.through
+
+    for condition, keywords in SYMPTOM_KEYWORDS.items():
+        symptom, created = Symptom.objects.get_or_create(name=condition)
+        keyword_query = SearchQuery(' | '.join(keywords), config='simple', search_type='raw')
+        medicine_ids = Medicine.objects.filter(search_vector=keyword_query).values_list('id', flat=True)
+        MedicineSymptom.objects.bulk_create([
+            MedicineSymptom(medicine_id=medicine_id, symptom_id=symptom.id)
+            for medicine_id in medicine_ids.iterator()
+        ], batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pharmacy', '0009_medicine_weighted_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Symptom',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='medicine',
+            name='symptoms',
+            field=models.ManyToManyField(blank=True, related_name='medicines', to='pharmacy.symptom'),
+        ),
+        migrations.RunPython(seed_symptoms, migrations.RunPython.noop),
+    ]
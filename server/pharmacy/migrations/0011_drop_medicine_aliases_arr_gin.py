@@ -0,0 +1,17 @@
+# Generated by Django 5.2.3 on 2026-10-15 22:12
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pharmacy', '0010_symptom_medicine_symptoms'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='medicine',
+            name='med_aliases_arr_gin',
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.3 on 2026-10-15 22:14
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('pharmacy', '0011_drop_medicine_aliases_arr_gin'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='medicine',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('name'), name='gin_trgm_ops'), name='med_name_upper_trgm'),
+        ),
+        AddIndexConcurrently(
+            model_name='medicine',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('generic_name'), name='gin_trgm_ops'), name='med_generic_name_upper_trgm'),
+        ),
+        AddIndexConcurrently(
+            model_name='medicine',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('brand_name'), name='gin_trgm_ops'), name='med_brand_name_upper_trgm'),
+        ),
+        AddIndexConcurrently(
+            model_name='medicinealias',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('alias'), name='gin_trgm_ops'), name='medicinealias_alias_upper_trgm'),
+        ),
+    ]
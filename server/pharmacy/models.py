@@ -1,5 +1,13 @@
 # pharmacy/models.py
+from decimal import Decimal, ROUND_HALF_UP
+
 from django.db import models
+from django.db.models import OuterRef
+from django.db.models.functions import Upper
+from django.contrib.postgres.expressions import ArraySubquery
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
 import uuid
@@ -27,6 +35,22 @@ class Manufacturer(models.Model):
     def __str__(self):
         return self.name
 
+class Symptom(models.Model):
+    """Conditions the WhatsApp bot suggests OTC medicines for, like Headache or Fever"""
+    # Stored lowercased, the form the bot matches incoming messages in
+    name = models.CharField(max_length=100, unique=True)
+    
+    def clean(self):
+        # Before validate_unique, so 'Fever' is reported as a duplicate of 'fever'
+        self.name = self.name.strip().lower()
+    
+    def save(self, *args, **kwargs):
+        self.name = self.name.strip().lower()
+        super().save(*args, **kwargs)
+    
+    def __str__(self):
+        return self.name
+
 class Medicine(models.Model):
     """Main medicine model"""
     PRESCRIPTION_CHOICES = [
@@ -56,6 +80,7 @@ class Medicine(models.Model):
     # Classification
     category = models.ForeignKey(Category, on_delete=models.CASCADE)
     manufacturer = models.ForeignKey(Manufacturer, on_delete=models.CASCADE)
+    symptoms = models.ManyToManyField(Symptom, related_name='medicines', blank=True)
     
     # Medicine Details
     composition = models.TextField(help_text="Active ingredients")
@@ -76,11 +101,25 @@ class Medicine(models.Model):
     mrp = models.DecimalField(max_digits=10, decimal_places=2, help_text="Maximum Retail Price")
     discount_percentage = models.DecimalField(max_digits=5, decimal_places=2, default=0.00, 
                                             validators=[MinValueValidator(0), MaxValueValidator(100)])
+    # Denormalised from mrp and discount_percentage in save() so it can be
+    # filtered, ordered and indexed in SQL
+    selling_price = models.DecimalField(max_digits=10, decimal_places=2, editable=False, db_index=True)
     
     # Stock & Status
     is_active = models.BooleanField(default=True)
     is_in_stock = models.BooleanField(default=True)
     
+    # Search
+    # Mirror of MedicineAlias rows, maintained by the MedicineAlias
+    # post_save/post_delete receivers, so a medicine's aliases are read
+    # without a join. save() leaves it out of its UPDATE unless named in
+    # update_fields, so a stale in-memory copy never overwrites the column
+    aliases_arr = ArrayField(models.CharField(max_length=200), default=list, blank=True, editable=False)
+    # Full-text index of name (weight A), generic_name (B), brand_name (C)
+    # and composition (D), kept up to date by a database trigger (see
+    # migrations 0008 and 0009)
+    search_vector = SearchVectorField(null=True, editable=False)
+    
     # Meta
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -91,16 +130,43 @@ class Medicine(models.Model):
             models.Index(fields=['name']),
             models.Index(fields=['generic_name']),
             models.Index(fields=['category']),
+            models.Index(fields=['brand_name']),
+            models.Index(fields=['is_active', 'is_in_stock']),
+            # Match the MedicineListView filters and its default name ordering
+            models.Index(fields=['is_active', 'category', 'name']),
+            models.Index(fields=['is_active', 'prescription_type', 'is_in_stock']),
+            # Trigram indexes serve the trigram_similar lookups used by search
+            GinIndex(name='med_name_trgm', fields=['name'], opclasses=['gin_trgm_ops']),
+            GinIndex(name='med_generic_name_trgm', fields=['generic_name'], opclasses=['gin_trgm_ops']),
+            GinIndex(name='med_brand_name_trgm', fields=['brand_name'], opclasses=['gin_trgm_ops']),
+            # icontains compiles to UPPER(column) LIKE, which only an index on
+            # the same expression can serve
+            GinIndex(OpClass(Upper('name'), name='gin_trgm_ops'), name='med_name_upper_trgm'),
+            GinIndex(OpClass(Upper('generic_name'), name='gin_trgm_ops'), name='med_generic_name_upper_trgm'),
+            GinIndex(OpClass(Upper('brand_name'), name='gin_trgm_ops'), name='med_brand_name_upper_trgm'),
+            GinIndex(name='med_composition_trgm', fields=['composition'], opclasses=['gin_trgm_ops']),
+            GinIndex(name='med_search_vector_gin', fields=['search_vector']),
         ]
     
     def __str__(self):
         return f"{self.name} - {self.strength}"
     
-    @property
-    def selling_price(self):
-        """Calculate selling price after discount"""
-        discount_amount = (self.mrp * self.discount_percentage) / 100
-        return self.mrp - discount_amount
+    def save(self, *args, **kwargs):
+        """Recalculate selling price after discount before saving"""
+        mrp = Decimal(self.mrp)
+        discount_amount = (mrp * Decimal(self.discount_percentage)) / 100
+        self.selling_price = (mrp - discount_amount).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'mrp', 'discount_percentage'}.intersection(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'selling_price'}
+        elif update_fields is None and not self._state.adding and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'aliases_arr'
+            ]
+        
+        super().save(*args, **kwargs)
     
     @property
     def is_prescription_required(self):
@@ -113,9 +179,30 @@ class MedicineAlias(models.Model):
     
     class Meta:
         unique_together = ['medicine', 'alias']
+        indexes = [
+            GinIndex(name='medicinealias_alias_trgm', fields=['alias'], opclasses=['gin_trgm_ops']),
+            GinIndex(OpClass(Upper('alias'), name='gin_trgm_ops'), name='medicinealias_alias_upper_trgm'),
+        ]
     
     def __str__(self):
         return f"{self.alias} -> {self.medicine.name}"
+    
+    # The medicine the row belonged to when loaded, so moving an alias can
+    # also re-sync the medicine it left (see signals.py)
+    _loaded_medicine_id = None
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_medicine_id = instance.__dict__.get('medicine_id')
+        return instance
+    
+    @staticmethod
+    def sync_medicine_aliases(medicine_id):
+        """Copy a medicine's alias rows onto Medicine.aliases_arr in one UPDATE"""
+        Medicine.objects.filter(pk=medicine_id).update(aliases_arr=ArraySubquery(
+            MedicineAlias.objects.filter(medicine=OuterRef('pk')).order_by('pk').values('alias')
+        ))
 
 class Pharmacy(models.Model):
     """Pharmacy/Medical store information"""
@@ -144,6 +231,11 @@ class Pharmacy(models.Model):
     
     class Meta:
         verbose_name_plural = "Pharmacies"
+        indexes = [
+            models.Index(fields=['is_active', 'pincode']),
+            GinIndex(name='pharmacy_name_trgm', fields=['name'], opclasses=['gin_trgm_ops']),
+            GinIndex(name='pharmacy_city_trgm', fields=['city'], opclasses=['gin_trgm_ops']),
+        ]
     
     def __str__(self):
         return self.name
@@ -167,6 +259,9 @@ class PharmacyInventory(models.Model):
     
     class Meta:
         unique_together = ['pharmacy', 'medicine', 'batch_number']
+        indexes = [
+            models.Index(fields=['expiry_date']),
+        ]
     
     def __str__(self):
         return f"{self.pharmacy.name} - {self.medicine.name} ({self.stock_quantity})"
@@ -197,6 +292,11 @@ class Customer(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['city']),
+        ]
+    
     def __str__(self):
         return f"{self.name or 'Customer'} - {self.phone_number}"
 
@@ -235,6 +335,12 @@ class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+            models.Index(fields=['customer', '-created_at']),
+        ]
+    
     def __str__(self):
         return f"Order {self.order_id} - {self.customer.name}"
 
@@ -264,6 +370,9 @@ class WhatsAppSession(models.Model):
     
     class Meta:
         unique_together = ['phone_number', 'session_id']
+        indexes = [
+            models.Index(fields=['phone_number', 'last_activity']),
+        ]
     
     def __str__(self):
         return f"{self.phone_number} - {self.current_step}"
\ No newline at end of file
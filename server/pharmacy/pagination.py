@@ -0,0 +1,135 @@
+# pharmacy/pagination.py
+import json
+
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+
+# Below this many estimated rows an exact COUNT(*) is cheap enough
+ESTIMATED_COUNT_THRESHOLD = 10000
+
+def _and_filter_targets(node):
+    """Yield the fields the where node requires to match, skipping OR and NOT branches"""
+    if node.connector != 'AND' or node.negated:
+        return
+    for child in node.children:
+        if hasattr(child, 'children'):
+            yield from _and_filter_targets(child)
+        else:
+            # Exists(), NothingNode and raw SQL have no lhs to read a field from
+            target = getattr(getattr(child, 'lhs', None), 'target', None)
+            if target is not None:
+                yield target
+
+class EstimatedPage(Page):
+    """Page that knows whether more rows follow without relying on the count"""
+    has_more = None
+    
+    def has_next(self):
+        if self.has_more is None:
+            return super().has_next()
+        return self.has_more
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that uses the planner's row estimate for large result sets.
+
+    COUNT(*) has to visit every matching row, so on big tables it can cost
+    more than the page itself. The PostgreSQL planner's estimate is used
+    instead once it passes ESTIMATED_COUNT_THRESHOLD; smaller results are
+    still counted exactly so page numbers stay accurate.
+
+    An estimate is only ever reported as the count: pages are served for as
+    long as there are rows, so an estimate below the real total never hides
+    the last orders.
+    """
+    # Lookups (as field paths) that always narrow the results to a few rows,
+    # such as one customer's orders; these are counted exactly without
+    # asking the planner first
+    selective_fields = ()
+    
+    estimated = False
+    
+    def _is_selective(self, queryset):
+        selective = set()
+        for path in self.selective_fields:
+            model = queryset.model
+            for name in path.split('__'):
+                field = model._meta.get_field(name)
+                model = field.related_model
+            selective.add(field)
+        return any(target in selective for target in _and_filter_targets(queryset.query.where))
+    
+    def planner_estimate(self, queryset):
+        """Return the PostgreSQL planner's row estimate for queryset"""
+        sql, params = queryset.query.sql_with_params()
+        with connections[queryset.db].cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return plan[0]['Plan']['Plan Rows']
+    
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql' or self._is_selective(queryset):
+            return super().count
+        
+        estimate = self.planner_estimate(queryset)
+        if estimate < ESTIMATED_COUNT_THRESHOLD:
+            return super().count
+        self.estimated = True
+        return estimate
+    
+    def validate_number(self, number):
+        self.count  # decides whether the count is only an estimate
+        if not self.estimated:
+            return super().validate_number(number)
+        
+        # Any page number is accepted; page() reports pages past the end
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(self.error_messages['invalid_page'])
+        if number < 1:
+            raise EmptyPage(self.error_messages['min_page'])
+        return number
+    
+    def page(self, number):
+        number = self.validate_number(number)
+        if not self.estimated:
+            return super().page(number)
+        
+        # Fetch one row past the page to learn whether another page follows
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage(self.error_messages['no_results'])
+        
+        page = self._get_page(rows[:self.per_page], number, self)
+        page.has_more = len(rows) > self.per_page
+        return page
+    
+    def _get_page(self, *args, **kwargs):
+        return EstimatedPage(*args, **kwargs)
+
+class OrderPaginator(EstimatedCountPaginator):
+    selective_fields = ('customer', 'customer__phone_number')
+
+class OrderPagination(PageNumberPagination):
+    page_size = 50
+    django_paginator_class = OrderPaginator
+    
+    def get_page_number(self, request, paginator):
+        # ?page=last resolves through num_pages, which an estimated count
+        # makes unreliable, so it is refused rather than answered wrongly
+        if request.query_params.get(self.page_query_param) in self.last_page_strings:
+            paginator.count  # decides whether the count is only an estimate
+            if paginator.estimated:
+                raise NotFound('The last page is not available for estimated result counts.')
+        return super().get_page_number(request, paginator)
@@ -0,0 +1,40 @@
+# pharmacy/renderers.py
+from decimal import Decimal
+
+import orjson
+from django.http import HttpResponse
+from django.utils.functional import Promise
+from rest_framework.renderers import BaseRenderer
+
+def orjson_default(obj):
+    """Encode the types orjson leaves to the caller"""
+    # Decimals become strings, as DecimalField renders them in serializer
+    # output; DRF's JSONEncoder would turn a raw Decimal into a float instead
+    if isinstance(obj, (Decimal, Promise)):
+        return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+def dumps(data, option=0):
+    # Serializer errors for list fields are keyed by the integer item index
+    return orjson.dumps(data, default=orjson_default, option=option | orjson.OPT_NON_STR_KEYS)
+
+class ORJSONRenderer(BaseRenderer):
+    """JSON renderer backed by orjson instead of the stdlib json module"""
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        
+        # The browsable API asks for indented output; orjson only indents by two
+        renderer_context = renderer_context or {}
+        option = orjson.OPT_INDENT_2 if renderer_context.get('indent') else 0
+        return dumps(data, option)
+
+def json_response(data, status=200):
+    """Encode plain dicts and lists straight to a JSON HttpResponse"""
+    return HttpResponse(dumps(data), status=status, content_type='application/json')
@@ -1,11 +1,20 @@
 # pharmacy/serializers.py
+from decimal import Decimal
+
+from django.db import connection, transaction
 from rest_framework import serializers
+
 from .models import (
     Medicine, Category, Manufacturer, Pharmacy, 
     PharmacyInventory, Customer, Order, OrderItem,
-    WhatsAppSession, MedicineAlias
+    WhatsAppSession
 )
 
+try:
+    from psycopg2.extras import execute_values
+except ImportError:  # psycopg 3 or a non-PostgreSQL backend
+    execute_values = None
+
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = Category
@@ -16,11 +25,6 @@ class ManufacturerSerializer(serializers.ModelSerializer):
         model = Manufacturer
         fields = '__all__'
 
-class MedicineAliasSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = MedicineAlias
-        fields = ['alias']
-
 class MedicineListSerializer(serializers.ModelSerializer):
     """Simplified serializer for medicine lists"""
     category_name = serializers.CharField(source='category.name', read_only=True)
@@ -39,13 +43,17 @@ class MedicineDetailSerializer(serializers.ModelSerializer):
     """Detailed serializer for individual medicine"""
     category = CategorySerializer(read_only=True)
     manufacturer = ManufacturerSerializer(read_only=True)
-    aliases = MedicineAliasSerializer(many=True, read_only=True)
+    aliases = serializers.SerializerMethodField()
     selling_price = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
     is_prescription_required = serializers.BooleanField(read_only=True)
     
     class Meta:
         model = Medicine
-        fields = '__all__'
+        exclude = ['aliases_arr', 'search_vector', 'symptoms']
+    
+    def get_aliases(self, obj):
+        # One {'alias': ...} object per alias, read from the denormalised array
+        return [{'alias': alias} for alias in obj.aliases_arr]
 
 class PharmacySerializer(serializers.ModelSerializer):
     class Meta:
@@ -90,20 +98,23 @@ class WhatsAppSessionSerializer(serializers.ModelSerializer):
         model = WhatsAppSession
         fields = '__all__'
 
-# Specialized serializers for WhatsApp bot responses
-class MedicineSearchSerializer(serializers.ModelSerializer):
-    """Optimized for WhatsApp bot medicine search results"""
-    category_name = serializers.CharField(source='category.name')
-    manufacturer_name = serializers.CharField(source='manufacturer.name')
-    selling_price = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
+# Carts larger than this skip OrderItem instances and insert rows directly
+BULK_INSERT_THRESHOLD = 1000
+
+def _bulk_insert_order_items(order_id, rows):
+    """Insert (medicine_id, quantity, unit_price, total_price) rows for an order through the cursor"""
+    sql = (
+        f"INSERT INTO {OrderItem._meta.db_table} "
+        "(order_id, medicine_id, quantity, unit_price, total_price) VALUES "
+    )
+    params = [(order_id, *row) for row in rows]
     
-    class Meta:
-        model = Medicine
-        fields = [
-            'id', 'name', 'strength', 'form', 'selling_price', 
-            'category_name', 'manufacturer_name', 'is_in_stock',
-            'prescription_type'
-        ]
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql' and execute_values is not None:
+            # Multi-row VALUES lists are much faster than psycopg2's executemany
+            execute_values(cursor.cursor, sql + "%s", params, page_size=500)
+        else:
+            cursor.executemany(sql + "(%s, %s, %s, %s, %s)", params)
 
 class QuickOrderSerializer(serializers.Serializer):
     """For quick order creation through WhatsApp"""
@@ -115,6 +126,7 @@ class QuickOrderSerializer(serializers.Serializer):
     delivery_address = serializers.CharField(required=False, allow_blank=True)
     notes = serializers.CharField(required=False, allow_blank=True)
     
+    @transaction.atomic
     def create(self, validated_data):
         # Custom order creation logic
         customer_phone = validated_data['customer_phone']
@@ -127,47 +139,61 @@ class QuickOrderSerializer(serializers.Serializer):
             defaults={'whatsapp_number': customer_phone}
         )
         
+        total_amount = Decimal('0')
+        prescription_required = False
+        
+        # Fetch all ordered medicines in one query
+        medicine_ids = [int(med_data['medicine_id']) for med_data in medicines_data]
+        medicines = Medicine.objects.filter(id__in=medicine_ids).only(
+            'id', 'selling_price', 'prescription_type'
+        ).in_bulk()
+        
+        # Price the order items before the order exists so the order row
+        # is inserted once with its final totals
+        order_lines = []
+        for med_data in medicines_data:
+            medicine = medicines.get(int(med_data['medicine_id']))
+            if medicine is None:
+                continue
+            
+            quantity = int(med_data['quantity'])
+            unit_price = medicine.selling_price
+            total_price = unit_price * quantity
+            
+            order_lines.append((medicine.id, quantity, unit_price, total_price))
+            
+            total_amount += total_price
+            
+            if medicine.is_prescription_required:
+                prescription_required = True
+        
+        tax_amount = total_amount * Decimal('0.05')  # 5% tax
+        
         # Create order
         order = Order.objects.create(
             customer=customer,
             pharmacy_id=pharmacy_id,
+            subtotal=total_amount,
+            tax_amount=tax_amount,
+            total_amount=total_amount + tax_amount,
+            prescription_required=prescription_required,
             delivery_address=validated_data.get('delivery_address', ''),
             notes=validated_data.get('notes', '')
         )
         
-        total_amount = 0
-        prescription_required = False
-        
         # Create order items
-        for med_data in medicines_data:
-            try:
-                medicine = Medicine.objects.get(id=med_data['medicine_id'])
-                quantity = int(med_data['quantity'])
-                
-                unit_price = medicine.selling_price
-                total_price = unit_price * quantity
-                
-                OrderItem.objects.create(
+        if len(order_lines) > BULK_INSERT_THRESHOLD:
+            _bulk_insert_order_items(order.id, order_lines)
+        else:
+            OrderItem.objects.bulk_create([
+                OrderItem(
                     order=order,
-                    medicine=medicine,
+                    medicine_id=medicine_id,
                     quantity=quantity,
                     unit_price=unit_price,
                     total_price=total_price
                 )
-                
-                total_amount += total_price
-                
-                if medicine.is_prescription_required:
-                    prescription_required = True
-                    
-            except Medicine.DoesNotExist:
-                continue
-        
-        # Update order totals
-        order.subtotal = total_amount
-        order.tax_amount = total_amount * 0.05  # 5% tax
-        order.total_amount = order.subtotal + order.tax_amount
-        order.prescription_required = prescription_required
-        order.save()
+                for medicine_id, quantity, unit_price, total_price in order_lines
+            ], batch_size=500)
         
         return order
\ No newline at end of file
@@ -0,0 +1,104 @@
+# pharmacy/sessions.py
+import json
+
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework import serializers
+
+from .models import WhatsAppSession
+from .serializers import WhatsAppSessionSerializer
+
+# How long an idle conversation stays in the cache
+SESSION_TIMEOUT = 60 * 60
+
+# Write the conversation back to the database every this many turns
+SESSION_FLUSH_EVERY = 5
+
+class SessionStore:
+    """Cache-backed WhatsApp conversation state.
+
+    Every bot message reads and updates the session, so the state lives in
+    the cache and the WhatsAppSession row is only written when the session
+    is loaded into the cache and then every SESSION_FLUSH_EVERY turns.
+    """
+    
+    def __init__(self, phone_number, session_id):
+        self.phone_number = phone_number
+        self.session_id = session_id
+        self.key = f'wa:{phone_number}:{session_id}'
+    
+    def _upsert(self, current_step=None, context_data=None, touch=False):
+        """Insert the session row or apply a turn to the existing one in one round trip
+
+        The conflict branch merges context_data into the stored JSON and
+        keeps the stored step when none is given.
+        """
+        table = WhatsAppSession._meta.db_table
+        now = timezone.now()
+        sql = (
+            f"INSERT INTO {table} "
+            "(phone_number, session_id, current_step, context_data, last_activity, created_at) "
+            "VALUES (%s, %s, %s, %s::jsonb, %s, %s) "
+            "ON CONFLICT (phone_number, session_id) DO UPDATE SET "
+            f"current_step = COALESCE(%s, {table}.current_step), "
+            f"context_data = {table}.context_data || EXCLUDED.context_data, "
+            f"last_activity = CASE WHEN %s THEN EXCLUDED.last_activity ELSE {table}.last_activity END "
+            "RETURNING *"
+        )
+        params = [
+            self.phone_number, self.session_id, current_step or 'start',
+            json.dumps(context_data or {}), now, now, current_step, touch,
+        ]
+        return WhatsAppSession.objects.raw(sql, params)[0]
+    
+    def _get_state(self, **turn):
+        """Return (state, loaded), upserting the session row on a cache miss"""
+        state = cache.get(self.key)
+        if state is not None:
+            return state, False
+        
+        session = self._upsert(**turn)
+        return {'session': dict(WhatsAppSessionSerializer(session).data), 'turns': 0}, True
+    
+    def load(self):
+        """Return the session in the shape of WhatsAppSessionSerializer"""
+        state, loaded = self._get_state()
+        cache.set(self.key, state, SESSION_TIMEOUT)
+        return state['session']
+    
+    def update(self, current_step=None, context_data=None):
+        """Apply one conversation turn and return the updated session"""
+        # On a cache miss the turn is written by the same statement that
+        # loads (or creates) the row, so it costs a single round trip
+        state, loaded = self._get_state(
+            current_step=current_step, context_data=context_data, touch=True
+        )
+        session = state['session']
+        
+        if not loaded:
+            if current_step is not None:
+                session['current_step'] = current_step
+            if context_data:
+                session['context_data'].update(context_data)
+            
+            now = timezone.now()
+            session['last_activity'] = serializers.DateTimeField().to_representation(now)
+            
+            state['turns'] += 1
+            if state['turns'] >= SESSION_FLUSH_EVERY:
+                self.flush(session, now)
+                state['turns'] = 0
+        
+        cache.set(self.key, state, SESSION_TIMEOUT)
+        return session
+    
+    def flush(self, session, last_activity):
+        """Persist the cached conversation state to its WhatsAppSession row"""
+        WhatsAppSession.objects.filter(
+            phone_number=self.phone_number,
+            session_id=self.session_id
+        ).update(
+            current_step=session['current_step'],
+            context_data=session['context_data'],
+            last_activity=last_activity
+        )
@@ -0,0 +1,32 @@
+# pharmacy/signals.py
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .caching import invalidate_catalog
+from .models import Category, Manufacturer, Medicine, MedicineAlias, Symptom
+
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=Manufacturer)
+@receiver([post_save, post_delete], sender=Medicine)
+@receiver([post_save, post_delete], sender=MedicineAlias)
+@receiver([post_save, post_delete], sender=Symptom)
+@receiver(m2m_changed, sender=Medicine.symptoms.through)
+def catalog_changed(sender, **kwargs):
+    # Bump the version only once the change is visible to other connections,
+    # otherwise a concurrent read could cache the old rows under the new version
+    transaction.on_commit(invalidate_catalog)
+
+@receiver(post_save, sender=MedicineAlias)
+def alias_saved(sender, instance, **kwargs):
+    MedicineAlias.sync_medicine_aliases(instance.medicine_id)
+    previous = instance._loaded_medicine_id
+    if previous is not None and previous != instance.medicine_id:
+        MedicineAlias.sync_medicine_aliases(previous)
+    instance._loaded_medicine_id = instance.medicine_id
+
+# Also fires for QuerySet.delete(); bulk_create() and update() send no signals,
+# so code using them must call MedicineAlias.sync_medicine_aliases() itself
+@receiver(post_delete, sender=MedicineAlias)
+def alias_deleted(sender, instance, **kwargs):
+    MedicineAlias.sync_medicine_aliases(instance.medicine_id)
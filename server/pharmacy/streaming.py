@@ -0,0 +1,30 @@
+# pharmacy/streaming.py
+from django.http import StreamingHttpResponse
+
+from .renderers import dumps
+
+# Rows fetched per server-side cursor round trip, and rows per response chunk
+STREAM_CHUNK_SIZE = 500
+
+def stream_json_array(queryset, serializer_class):
+    """Yield a JSON array of serialized rows without materialising the queryset"""
+    serializer = serializer_class()
+    separator = b''
+    batch = []
+    
+    yield b'['
+    for obj in queryset.iterator(chunk_size=STREAM_CHUNK_SIZE):
+        batch.append(dumps(serializer.to_representation(obj)))
+        if len(batch) == STREAM_CHUNK_SIZE:
+            yield separator + b','.join(batch)
+            separator = b','
+            batch = []
+    if batch:
+        yield separator + b','.join(batch)
+    yield b']'
+
+def streaming_json_response(queryset, serializer_class):
+    return StreamingHttpResponse(
+        stream_json_array(queryset, serializer_class),
+        content_type='application/json'
+    )
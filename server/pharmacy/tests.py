@@ -1,3 +1,622 @@
-from django.test import TestCase
+import json
+from datetime import date, time, timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Exists, OuterRef
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from . import pagination, serializers as pharmacy_serializers, streaming
+from .renderers import ORJSONRenderer
+from .models import (
+    Category, Manufacturer, Medicine, MedicineAlias, Pharmacy, PharmacyInventory,
+    Customer, Order, OrderItem, WhatsAppSession, Symptom
+)
+from .serializers import QuickOrderSerializer
+from .sessions import SessionStore
+
+# Keep tests off any shared Redis configured for the environment
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+def make_medicine(category, manufacturer, **kwargs):
+    fields = {
+        'name': 'Paracetamol',
+        'composition': 'Paracetamol 500mg',
+        'strength': '500mg',
+        'form': 'TAB',
+        'pack_size': '10 tablets',
+        'indication': 'Fever and pain',
+        'dosage': 'One tablet every 6 hours',
+        'mrp': Decimal('100.00'),
+    }
+    fields.update(kwargs)
+    return Medicine.objects.create(category=category, manufacturer=manufacturer, **fields)
+
+def make_pharmacy(**kwargs):
+    fields = {
+        'name': 'City Pharmacy',
+        'license_number': 'LIC-1',
+        'owner_name': 'Owner',
+        'phone': '9000000000',
+        'address_line1': '1 Main Road',
+        'city': 'Pune',
+        'state': 'Maharashtra',
+        'pincode': '411001',
+        'opening_time': time(9),
+        'closing_time': time(21),
+    }
+    fields.update(kwargs)
+    return Pharmacy.objects.create(**fields)
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class CatalogTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name='Analgesics')
+        cls.manufacturer = Manufacturer.objects.create(name='Acme Pharma')
+        cls.pharmacy = make_pharmacy()
+    
+    def setUp(self):
+        cache.clear()
+
+class ChangelistQueryCountTests(CatalogTestCase):
+    """Admin changelists must not issue a query per row"""
+    
+    def setUp(self):
+        super().setUp()
+        user = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(user)
+        self.rows = 0
+    
+    def assertChangelistQueriesConstant(self, model_name, make_row):
+        url = reverse(f'admin:pharmacy_{model_name}_changelist')
+        make_row()
+        with CaptureQueriesContext(connection) as baseline:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        
+        for _ in range(5):
+            make_row()
+        with self.assertNumQueries(len(baseline)):
+            self.assertEqual(self.client.get(url).status_code, 200)
+    
+    def next_row(self):
+        self.rows += 1
+        return self.rows
+    
+    def test_medicine_changelist(self):
+        self.assertChangelistQueriesConstant('medicine', lambda: make_medicine(
+            self.category, self.manufacturer, name=f'Medicine {self.next_row()}'
+        ))
+    
+    def test_inventory_changelist(self):
+        def make_row():
+            medicine = make_medicine(self.category, self.manufacturer, name=f'Medicine {self.next_row()}')
+            PharmacyInventory.objects.create(
+                pharmacy=self.pharmacy, medicine=medicine, stock_quantity=5,
+                expiry_date=date.today() + timedelta(days=30),
+                cost_price=Decimal('50.00'), selling_price=Decimal('90.00')
+            )
+        self.assertChangelistQueriesConstant('pharmacyinventory', make_row)
+    
+    def test_customer_changelist(self):
+        self.assertChangelistQueriesConstant('customer', lambda: Customer.objects.create(
+            phone_number=f'91000{self.next_row()}', preferred_pharmacy=self.pharmacy
+        ))
+    
+    def test_order_changelist(self):
+        medicine = make_medicine(self.category, self.manufacturer)
+        
+        def make_row():
+            customer = Customer.objects.create(phone_number=f'92000{self.next_row()}')
+            order = Order.objects.create(customer=customer, pharmacy=self.pharmacy)
+            OrderItem.objects.create(
+                order=order, medicine=medicine, quantity=1,
+                unit_price=Decimal('90.00'), total_price=Decimal('90.00')
+            )
+        self.assertChangelistQueriesConstant('order', make_row)
+
+class MedicineSellingPriceTests(CatalogTestCase):
+    def test_selling_price_is_stored_after_discount(self):
+        medicine = make_medicine(self.category, self.manufacturer, discount_percentage=Decimal('10'))
+        medicine.refresh_from_db()
+        self.assertEqual(medicine.selling_price, Decimal('90.00'))
+    
+    def test_selling_price_rounds_half_up(self):
+        medicine = make_medicine(
+            self.category, self.manufacturer,
+            mrp=Decimal('10.05'), discount_percentage=Decimal('50')
+        )
+        medicine.refresh_from_db()
+        self.assertEqual(medicine.selling_price, Decimal('5.03'))
+    
+    def test_update_fields_with_price_inputs_saves_selling_price(self):
+        medicine = make_medicine(self.category, self.manufacturer)
+        medicine.mrp = Decimal('200.00')
+        medicine.save(update_fields=['mrp'])
+        medicine.refresh_from_db()
+        self.assertEqual(medicine.selling_price, Decimal('200.00'))
+        
+        medicine.discount_percentage = Decimal('25')
+        medicine.save(update_fields=['discount_percentage'])
+        medicine.refresh_from_db()
+        self.assertEqual(medicine.selling_price, Decimal('150.00'))
+    
+    def test_update_fields_without_price_inputs_leaves_price(self):
+        medicine = make_medicine(self.category, self.manufacturer)
+        with CaptureQueriesContext(connection) as queries:
+            medicine.is_in_stock = False
+            medicine.save(update_fields=['is_in_stock'])
+        self.assertNotIn('selling_price', queries[-1]['sql'])
+
+class MedicineAliasArrayTests(CatalogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.medicine = make_medicine(self.category, self.manufacturer)
+    
+    def stored_aliases(self, medicine):
+        return Medicine.objects.values_list('aliases_arr', flat=True).get(pk=medicine.pk)
+    
+    def test_aliases_are_mirrored_on_save_and_delete(self):
+        MedicineAlias.objects.create(medicine=self.medicine, alias='Dolo')
+        alias = MedicineAlias.objects.create(medicine=self.medicine, alias='Calpol')
+        self.assertEqual(self.stored_aliases(self.medicine), ['Dolo', 'Calpol'])
+        
+        alias.delete()
+        self.assertEqual(self.stored_aliases(self.medicine), ['Dolo'])
+        
+        MedicineAlias.objects.filter(medicine=self.medicine).delete()
+        self.assertEqual(self.stored_aliases(self.medicine), [])
+    
+    def test_moving_an_alias_resyncs_both_medicines(self):
+        other = make_medicine(self.category, self.manufacturer, name='Ibuprofen')
+        MedicineAlias.objects.create(medicine=self.medicine, alias='Brufen')
+        
+        alias = MedicineAlias.objects.get(alias='Brufen')
+        alias.medicine = other
+        alias.save()
+        
+        self.assertEqual(self.stored_aliases(self.medicine), [])
+        self.assertEqual(self.stored_aliases(other), ['Brufen'])
+    
+    def test_full_save_keeps_aliases_added_since_load(self):
+        MedicineAlias.objects.create(medicine=self.medicine, alias='Dolo')
+        
+        self.medicine.is_in_stock = False
+        self.medicine.save()
+        
+        self.assertEqual(self.stored_aliases(self.medicine), ['Dolo'])
+        self.assertFalse(Medicine.objects.get(pk=self.medicine.pk).is_in_stock)
+    
+    def test_naming_aliases_arr_still_writes_it(self):
+        MedicineAlias.objects.create(medicine=self.medicine, alias='Dolo')
+        self.medicine.aliases_arr = ['Dolo', 'Crocin']
+        self.medicine.save(update_fields=['aliases_arr'])
+        self.assertEqual(self.stored_aliases(self.medicine), ['Dolo', 'Crocin'])
+
+class QuickOrderTests(CatalogTestCase):
+    def create_order(self, medicines):
+        serializer = QuickOrderSerializer(data={
+            'customer_phone': '9100000000',
+            'pharmacy_id': self.pharmacy.id,
+            'medicines': medicines,
+        })
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        return serializer.save()
+    
+    def test_small_cart_uses_bulk_create(self):
+        medicine = make_medicine(self.category, self.manufacturer)
+        with mock.patch.object(pharmacy_serializers, '_bulk_insert_order_items') as cursor_insert:
+            order = self.create_order([{'medicine_id': str(medicine.id), 'quantity': '2'}])
+        
+        cursor_insert.assert_not_called()
+        self.assertEqual(order.items.count(), 1)
+        self.assertEqual(order.subtotal, Decimal('200.00'))
+    
+    def test_large_cart_inserts_through_cursor(self):
+        medicine = make_medicine(self.category, self.manufacturer)
+        lines = pharmacy_serializers.BULK_INSERT_THRESHOLD + 1
+        cursor_insert = mock.Mock(wraps=pharmacy_serializers._bulk_insert_order_items)
+        with mock.patch.object(pharmacy_serializers, '_bulk_insert_order_items', cursor_insert):
+            order = self.create_order([
+                {'medicine_id': str(medicine.id), 'quantity': '1'} for _ in range(lines)
+            ])
+        
+        cursor_insert.assert_called_once()
+        items = OrderItem.objects.filter(order=order)
+        self.assertEqual(items.count(), lines)
+        self.assertEqual(items.first().unit_price, Decimal('100.00'))
+        self.assertEqual(order.subtotal, Decimal('100.00') * lines)
+
+class ORJSONRendererTests(CatalogTestCase):
+    def test_decimals_render_as_strings(self):
+        rendered = ORJSONRenderer().render({'price': Decimal('12.50'), 'tags': {'otc'}})
+        self.assertEqual(json.loads(rendered), {'price': '12.50', 'tags': ['otc']})
+    
+    def test_indent_is_honoured(self):
+        rendered = ORJSONRenderer().render({'a': 1}, renderer_context={'indent': 4})
+        self.assertEqual(rendered, b'{\n  "a": 1\n}')
+    
+    def test_no_data_renders_empty_body(self):
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+    
+    def test_list_field_errors_with_integer_keys_render_as_400(self):
+        response = self.client.post(reverse('pharmacy:quick-order'), {
+            'customer_phone': '9100000000',
+            'pharmacy_id': self.pharmacy.id,
+            'medicines': [{'medicine_id': '1', 'quantity': '1'}, 'not a line'],
+        }, content_type='application/json')
+        
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('1', response.json()['medicines'])
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class SessionStoreTests(TestCase):
+    def setUp(self):
+        cache.clear()
+    
+    def test_update_creates_session_with_turn_applied(self):
+        session = SessionStore('9100000000', 'default').update('search', {'query': 'paracetamol'})
+        
+        row = WhatsAppSession.objects.get(phone_number='9100000000', session_id='default')
+        self.assertEqual(row.current_step, 'search')
+        self.assertEqual(row.context_data, {'query': 'paracetamol'})
+        self.assertEqual(session['current_step'], 'search')
+    
+    def test_update_on_cache_miss_merges_context_into_existing_row(self):
+        WhatsAppSession.objects.create(
+            phone_number='9100000000', session_id='default',
+            current_step='cart', context_data={'pharmacy_id': 1}
+        )
+        
+        session = SessionStore('9100000000', 'default').update(context_data={'query': 'crocin'})
+        
+        row = WhatsAppSession.objects.get(phone_number='9100000000', session_id='default')
+        self.assertEqual(row.current_step, 'cart')
+        self.assertEqual(row.context_data, {'pharmacy_id': 1, 'query': 'crocin'})
+        self.assertEqual(session['context_data'], {'pharmacy_id': 1, 'query': 'crocin'})
+        self.assertEqual(WhatsAppSession.objects.count(), 1)
+    
+    def test_load_does_not_touch_existing_row(self):
+        row = WhatsAppSession.objects.create(phone_number='9100000000', session_id='default')
+        last_activity = row.last_activity
+        
+        session = SessionStore('9100000000', 'default').load()
+        
+        row.refresh_from_db()
+        self.assertEqual(row.last_activity, last_activity)
+        self.assertEqual(session['current_step'], 'start')
+    
+    def test_load_creates_missing_session(self):
+        session = SessionStore('9100000000', 'default').load()
+        
+        self.assertEqual(session['current_step'], 'start')
+        self.assertEqual(session['context_data'], {})
+        self.assertTrue(WhatsAppSession.objects.filter(phone_number='9100000000').exists())
+
+class FullTextSearchFilterTests(CatalogTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.paracetamol = make_medicine(cls.category, cls.manufacturer, name='Paracetamol')
+        cls.combination = make_medicine(
+            cls.category, cls.manufacturer, name='Combiflam',
+            composition='Ibuprofen 400mg and Paracetamol 325mg'
+        )
+        cls.cetirizine = make_medicine(
+            cls.category, cls.manufacturer, name='Cetirizine', composition='Cetirizine 10mg'
+        )
+    
+    def search(self, **params):
+        response = self.client.get(reverse('pharmacy:medicine-list'), params)
+        self.assertEqual(response.status_code, 200)
+        return [item['name'] for item in response.json()['results']]
+    
+    def test_ranks_name_matches_above_composition_matches(self):
+        self.assertEqual(self.search(search='paracetamol'), ['Paracetamol', 'Combiflam'])
+    
+    def test_matches_word_prefixes(self):
+        self.assertEqual(self.search(search='ceti'), ['Cetirizine'])
+    
+    def test_every_word_must_match(self):
+        self.assertEqual(self.search(search='ibuprofen paracetamol'), ['Combiflam'])
+    
+    def test_explicit_ordering_overrides_rank(self):
+        self.assertEqual(self.search(search='paracetamol', ordering='name'), ['Combiflam', 'Paracetamol'])
+    
+    def test_blank_search_returns_everything(self):
+        self.assertEqual(self.search(search='  '), ['Cetirizine', 'Combiflam', 'Paracetamol'])
+
+class CatalogCacheTests(CatalogTestCase):
+    def category_names(self):
+        response = self.client.get(reverse('pharmacy:category-list'))
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        return [category['name'] for category in data.get('results', data)]
+    
+    def test_repeat_list_is_served_from_cache(self):
+        self.category_names()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.category_names(), ['Analgesics'])
+    
+    def test_cache_is_invalidated_once_the_change_commits(self):
+        self.assertEqual(self.category_names(), ['Analgesics'])
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name='Antibiotics')
+            # Until the transaction commits, other readers may still see the
+            # old rows, so the cached list must stay in place
+            self.assertEqual(self.category_names(), ['Analgesics'])
+        
+        self.assertEqual(sorted(self.category_names()), ['Analgesics', 'Antibiotics'])
+    
+    def test_deletes_invalidate_the_cache(self):
+        category = Category.objects.create(name='Antibiotics')
+        self.assertEqual(len(self.category_names()), 2)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            category.delete()
+        
+        self.assertEqual(self.category_names(), ['Analgesics'])
+
+class MedicineDetailCacheTests(CatalogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.medicine = make_medicine(self.category, self.manufacturer)
+    
+    def get_detail(self, pk=None):
+        return self.client.get(reverse('pharmacy:medicine-detail', args=[pk or self.medicine.pk]))
+    
+    def test_repeat_detail_is_served_from_cache(self):
+        self.get_detail()
+        with self.assertNumQueries(0):
+            response = self.get_detail()
+        self.assertEqual(response.json()['name'], 'Paracetamol')
+    
+    def test_new_alias_shows_once_committed(self):
+        self.assertEqual(self.get_detail().json()['aliases'], [])
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            MedicineAlias.objects.create(medicine=self.medicine, alias='Dolo')
+        
+        self.assertEqual(self.get_detail().json()['aliases'], [{'alias': 'Dolo'}])
+    
+    def test_deactivated_medicine_is_no_longer_served(self):
+        self.assertEqual(self.get_detail().status_code, 200)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.medicine.is_active = False
+            self.medicine.save()
+        
+        self.assertEqual(self.get_detail().status_code, 404)
+    
+    def test_missing_medicine_is_not_cached(self):
+        self.assertEqual(self.get_detail(self.medicine.pk + 1000).status_code, 404)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.get_detail(self.medicine.pk + 1000).status_code, 404)
+
+class MedicineSearchTests(CatalogTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.paracetamol = make_medicine(cls.category, cls.manufacturer)
+        cls.paracetamol_forte = make_medicine(cls.category, cls.manufacturer, name='Paracetamol Forte')
+        cls.ibuprofen = make_medicine(cls.category, cls.manufacturer, name='Ibuprofen', composition='Ibuprofen 400mg')
+        make_medicine(cls.category, cls.manufacturer, name='Paracetamol Old', is_active=False)
+        MedicineAlias.objects.create(medicine=cls.ibuprofen, alias='Brufen')
+    
+    def search(self, **params):
+        response = self.client.get(reverse('pharmacy:medicine-search'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+    
+    def add_stock(self, medicine, quantity, batch_number, pharmacy=None):
+        PharmacyInventory.objects.create(
+            pharmacy=pharmacy or self.pharmacy, medicine=medicine, stock_quantity=quantity,
+            batch_number=batch_number, expiry_date=date.today() + timedelta(days=30),
+            cost_price=Decimal('50.00'), selling_price=Decimal('90.00')
+        )
+    
+    def test_query_is_required(self):
+        response = self.client.get(reverse('pharmacy:medicine-search'), {'q': '  '})
+        self.assertEqual(response.status_code, 400)
+    
+    def test_closest_name_ranks_first(self):
+        names = [row['name'] for row in self.search(q='paracetamol')]
+        self.assertEqual(names, ['Paracetamol', 'Paracetamol Forte'])
+    
+    def test_misspelt_name_matches_by_similarity(self):
+        names = [row['name'] for row in self.search(q='paracetmol')]
+        self.assertIn('Paracetamol', names)
+    
+    def test_alias_finds_its_medicine_once(self):
+        MedicineAlias.objects.create(medicine=self.ibuprofen, alias='Brufen 400')
+        rows = self.search(q='brufen')
+        self.assertEqual([row['id'] for row in rows], [self.ibuprofen.id])
+    
+    def test_limit_caps_the_results(self):
+        self.assertEqual(len(self.search(q='paracetamol', limit=1)), 1)
+    
+    def test_stock_is_summed_across_batches_in_one_query(self):
+        self.add_stock(self.paracetamol, 5, 'B1')
+        self.add_stock(self.paracetamol, 7, 'B2')
+        self.add_stock(self.paracetamol, 0, 'B3')
+        self.add_stock(self.paracetamol, 40, 'B1', pharmacy=make_pharmacy(license_number='LIC-2'))
+        
+        with self.assertNumQueries(1):
+            rows = {row['name']: row for row in self.search(q='paracetamol', pharmacy_id=self.pharmacy.id)}
+        
+        self.assertEqual(rows['Paracetamol']['stock_quantity'], 12)
+        self.assertTrue(rows['Paracetamol']['available_at_pharmacy'])
+        self.assertEqual(rows['Paracetamol Forte']['stock_quantity'], 0)
+        self.assertFalse(rows['Paracetamol Forte']['available_at_pharmacy'])
+    
+    def test_unknown_pharmacy_has_nothing_in_stock(self):
+        rows = self.search(q='paracetamol', pharmacy_id=self.pharmacy.id + 1000)
+        self.assertTrue(rows)
+        self.assertFalse(any(row['available_at_pharmacy'] for row in rows))
+    
+    def test_prices_are_rendered_as_strings(self):
+        row = self.search(q='paracetamol')[0]
+        self.assertEqual(row['selling_price'], '100.00')
+        self.assertNotIn('stock_quantity', row)
+
+class SymptomSuggestionTests(CatalogTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        # Seeded by migration 0010
+        cls.headache = Symptom.objects.get(name='headache')
+        cls.fever = Symptom.objects.get(name='fever')
+        
+        cls.aspirin = make_medicine(cls.category, cls.manufacturer, name='Aspirin')
+        cls.crocin = make_medicine(cls.category, cls.manufacturer, name='Crocin')
+        cls.prescription_only = make_medicine(
+            cls.category, cls.manufacturer, name='Tramadol', prescription_type='RX'
+        )
+        cls.inactive = make_medicine(cls.category, cls.manufacturer, name='Old Aspirin', is_active=False)
+        cls.headache.medicines.add(cls.aspirin, cls.prescription_only, cls.inactive)
+        cls.fever.medicines.add(cls.crocin)
+    
+    def suggest(self, symptom):
+        response = self.client.get(reverse('pharmacy:medicine-suggestions'), {'symptom': symptom})
+        self.assertEqual(response.status_code, 200)
+        return [item['name'] for item in response.json()]
+    
+    def test_names_are_stored_lowercased(self):
+        symptom = Symptom.objects.create(name='  Back Pain ')
+        self.assertEqual(symptom.name, 'back pain')
+    
+    def test_clean_reports_case_only_duplicates(self):
+        with self.assertRaises(ValidationError):
+            Symptom(name='Headache').full_clean()
+    
+    def test_suggests_active_otc_medicines_linked_to_the_symptom(self):
+        self.assertEqual(self.suggest('I have a bad Headache'), ['Aspirin'])
+    
+    def test_first_symptom_in_the_message_wins(self):
+        self.assertEqual(self.suggest('fever and headache'), ['Crocin'])
+    
+    def test_unknown_symptom_has_no_suggestions(self):
+        self.assertEqual(self.suggest('sore knee'), [])
+    
+    def test_symptom_added_later_is_recognised(self):
+        self.assertEqual(self.suggest('itchy rash'), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            Symptom.objects.create(name='rash').medicines.add(self.crocin)
+        self.assertEqual(self.suggest('itchy rash'), ['Crocin'])
+    
+    def test_prices_are_rendered_as_strings(self):
+        response = self.client.get(reverse('pharmacy:medicine-suggestions'), {'symptom': 'headache'})
+        self.assertEqual(response.json()[0]['selling_price'], '100.00')
+
+class OrderPaginationTests(CatalogTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.customer = Customer.objects.create(phone_number='9100000000')
+        cls.orders = [Order.objects.create(customer=cls.customer, pharmacy=cls.pharmacy) for _ in range(7)]
+    
+    def setUp(self):
+        super().setUp()
+        # Three orders per page, and every planner estimate is trusted
+        for patcher in (
+            mock.patch.object(pagination.OrderPagination, 'page_size', 3),
+            mock.patch.object(pagination, 'ESTIMATED_COUNT_THRESHOLD', 0),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+    
+    def get_orders(self, **params):
+        return self.client.get(reverse('pharmacy:order-list'), params)
+    
+    def collect_pages(self):
+        """Follow next links from the first page, returning (count, order ids)"""
+        response = self.get_orders()
+        count, order_ids = response.json()['count'], []
+        while True:
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            order_ids += [order['order_id'] for order in data['results']]
+            if not data['next']:
+                return count, order_ids
+            response = self.client.get(data['next'])
+    
+    def test_low_estimate_still_reaches_every_order(self):
+        with mock.patch.object(pagination.OrderPaginator, 'planner_estimate', return_value=2):
+            count, order_ids = self.collect_pages()
+        
+        self.assertEqual(count, 2)
+        self.assertEqual(sorted(order_ids), sorted(str(order.order_id) for order in self.orders))
+    
+    def test_high_estimate_ends_at_the_last_real_page(self):
+        with mock.patch.object(pagination.OrderPaginator, 'planner_estimate', return_value=1000):
+            count, order_ids = self.collect_pages()
+            past_the_end = self.get_orders(page=4)
+        
+        self.assertEqual(count, 1000)
+        self.assertEqual(len(order_ids), 7)
+        self.assertEqual(past_the_end.status_code, 404)
+    
+    def test_last_page_is_refused_for_estimated_counts(self):
+        with mock.patch.object(pagination.OrderPaginator, 'planner_estimate', return_value=1000):
+            self.assertEqual(self.get_orders(page='last').status_code, 404)
+    
+    def test_last_page_works_for_exact_counts(self):
+        with mock.patch.object(pagination, 'ESTIMATED_COUNT_THRESHOLD', 10000):
+            response = self.get_orders(page='last')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 7)
+        self.assertEqual(len(response.json()['results']), 1)
+    
+    def test_customer_history_is_counted_without_explain(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get_orders(phone_number='9100000000')
+        
+        self.assertEqual(response.json()['count'], 7)
+        self.assertFalse(any(query['sql'].startswith('EXPLAIN') for query in queries))
+    
+    def test_unfiltered_list_asks_the_planner(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.get_orders()
+        self.assertTrue(any(query['sql'].startswith('EXPLAIN') for query in queries))
+    
+    def test_filters_without_a_field_are_not_selective(self):
+        has_items = Exists(OrderItem.objects.filter(order=OuterRef('pk')))
+        paginator = pagination.OrderPaginator(Order.objects.filter(has_items).order_by('-created_at'), 3)
+        self.assertEqual(paginator.count, paginator.planner_estimate(paginator.object_list))
+
+class InventoryStreamTests(CatalogTestCase):
+    def stream_inventory(self):
+        response = self.client.get(reverse('pharmacy:pharmacy-inventory', args=[self.pharmacy.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        return json.loads(b''.join(response.streaming_content))
+    
+    def test_empty_inventory_is_an_empty_array(self):
+        self.assertEqual(self.stream_inventory(), [])
+    
+    def test_rows_are_joined_across_chunks(self):
+        for number in range(5):
+            medicine = make_medicine(self.category, self.manufacturer, name=f'Medicine {number}')
+            PharmacyInventory.objects.create(
+                pharmacy=self.pharmacy, medicine=medicine, stock_quantity=number + 1,
+                expiry_date=date.today() + timedelta(days=30),
+                cost_price=Decimal('50.00'), selling_price=Decimal('90.00')
+            )
+        
+        with mock.patch.object(streaming, 'STREAM_CHUNK_SIZE', 2):
+            rows = self.stream_inventory()
+        
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]['selling_price'], '90.00')
+        self.assertEqual(
+            sorted(row['medicine_name'] for row in rows),
+            [f'Medicine {number}' for number in range(5)]
+        )
@@ -1,37 +1,91 @@
 # pharmacy/views.py
+import re
+
 from rest_framework import generics, status, filters
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
-from django.db.models import Q
+from django.contrib.postgres.search import TrigramSimilarity
+from django.core.cache import cache
+from django.db.models import (
+    BooleanField, ExpressionWrapper, F, IntegerField, OuterRef, Prefetch, Q,
+    Subquery, Sum, prefetch_related_objects
+)
+from django.db.models.functions import Coalesce, Greatest
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 
 from .models import (
-    Medicine, Category, Manufacturer, Pharmacy, 
-    PharmacyInventory, Customer, Order, OrderItem,
-    WhatsAppSession
+    Medicine, MedicineAlias, Category, Manufacturer, Pharmacy, 
+    PharmacyInventory, Customer, Order, OrderItem, Symptom
 )
 from .serializers import (
-    MedicineListSerializer, MedicineDetailSerializer, MedicineSearchSerializer,
+    MedicineListSerializer, MedicineDetailSerializer,
     CategorySerializer, ManufacturerSerializer, PharmacySerializer,
     PharmacyInventorySerializer, CustomerSerializer, OrderSerializer,
-    WhatsAppSessionSerializer, QuickOrderSerializer
+    QuickOrderSerializer
+)
+from .caching import (
+    CATALOG_CACHE_TIMEOUT, CachedListMixin, CachedRetrieveMixin, catalog_cache_key,
+    catalog_version
 )
+from .filters import FullTextSearchFilter
+from .pagination import OrderPagination
+from .renderers import json_response
+from .sessions import SessionStore
+from .streaming import streaming_json_response
 
 # Medicine Views
 class MedicineListView(generics.ListAPIView):
-    queryset = Medicine.objects.filter(is_active=True)
+    # Load only the columns MedicineListSerializer renders; the large text
+    # fields (composition, indication, dosage, ...) stay in the database
+    queryset = Medicine.objects.filter(is_active=True).select_related(
+        'category', 'manufacturer'
+    ).only(
+        'id', 'name', 'generic_name', 'brand_name', 'strength', 'form',
+        'mrp', 'selling_price', 'is_in_stock', 'prescription_type',
+        'category__name', 'manufacturer__name'
+    )
     serializer_class = MedicineListSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    # Full-text search runs last so its relevance ranking can take over
+    # the default ordering
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, FullTextSearchFilter]
     filterset_fields = ['category', 'manufacturer', 'form', 'prescription_type', 'is_in_stock']
-    search_fields = ['name', 'generic_name', 'brand_name', 'composition']
-    ordering_fields = ['name', 'mrp', 'created_at']
+    ordering_fields = ['name', 'mrp', 'selling_price', 'created_at']
     ordering = ['name']
 
-class MedicineDetailView(generics.RetrieveAPIView):
-    queryset = Medicine.objects.filter(is_active=True)
+class MedicineDetailView(CachedRetrieveMixin, generics.RetrieveAPIView):
+    cache_name = 'medicine'
+    queryset = Medicine.objects.filter(is_active=True).select_related(
+        'category', 'manufacturer'
+    )
     serializer_class = MedicineDetailSerializer
 
+# Bot search results are built from values() rows, skipping model
+# instances and serializer fields
+MEDICINE_SEARCH_FIELDS = (
+    'id', 'name', 'strength', 'form', 'selling_price', 'is_in_stock', 'prescription_type'
+)
+
+def medicine_search_rows(medicines, limit, *extra_fields, **extra):
+    """Return up to limit medicines as plain dicts for the WhatsApp bot"""
+    # Decimal prices are rendered as strings by the JSON renderer
+    return list(medicines.values(
+        *MEDICINE_SEARCH_FIELDS,
+        *extra_fields,
+        category_name=F('category__name'),
+        manufacturer_name=F('manufacturer__name'),
+        **extra
+    )[:limit])
+
+def pharmacy_stock(pharmacy_id):
+    """Expression for a medicine's in-stock quantity at a pharmacy, summed over batches"""
+    in_stock = PharmacyInventory.objects.filter(
+        pharmacy_id=pharmacy_id,
+        medicine=OuterRef('pk'),
+        stock_quantity__gt=0
+    ).order_by().values('medicine').annotate(total=Sum('stock_quantity')).values('total')
+    return Coalesce(Subquery(in_stock), 0, output_field=IntegerField())
+
 @api_view(['GET'])
 def search_medicines(request):
     """Advanced medicine search for WhatsApp bot"""
@@ -42,51 +96,58 @@ def search_medicines(request):
     if not query:
         return Response({'error': 'Search query is required'}, status=400)
     
-    # Search in medicine names, generic names, and aliases
-    medicines = Medicine.objects.filter(
+    # Search in medicine names, generic names, and aliases. Each half of the
+    # UNION is an OR of lookups on one table, all backed by trigram indexes,
+    # so Postgres can answer each with a BitmapOr; the alias half stays inside
+    # the search query rather than costing a round trip and an id IN (...) list
+    name_matches = Medicine.objects.filter(
         Q(name__icontains=query) |
         Q(generic_name__icontains=query) |
         Q(brand_name__icontains=query) |
-        Q(aliases__alias__icontains=query),
+        Q(name__trigram_similar=query) |
+        Q(generic_name__trigram_similar=query) |
+        Q(brand_name__trigram_similar=query)
+    ).order_by().values('pk')
+    alias_matches = MedicineAlias.objects.filter(
+        Q(alias__icontains=query) | Q(alias__trigram_similar=query)
+    ).order_by().values('medicine_id')
+    medicines = Medicine.objects.filter(
+        pk__in=name_matches.union(alias_matches),
         is_active=True
-    ).distinct()[:limit]
+    ).annotate(
+        search_rank=Greatest(
+            TrigramSimilarity('name', query),
+            TrigramSimilarity('generic_name', query),
+            TrigramSimilarity('brand_name', query),
+        )
+    ).order_by('-search_rank', 'name')
     
-    # If pharmacy_id provided, check stock availability
+    # If pharmacy_id provided, read stock availability in the same query;
+    # an unknown pharmacy simply has nothing in stock
+    stock_fields, stock = (), {}
     if pharmacy_id:
-        try:
-            pharmacy = Pharmacy.objects.get(id=pharmacy_id)
-            medicine_ids = medicines.values_list('id', flat=True)
-            inventory = PharmacyInventory.objects.filter(
-                pharmacy=pharmacy,
-                medicine_id__in=medicine_ids,
-                stock_quantity__gt=0
-            ).values('medicine_id', 'stock_quantity')
-            
-            inventory_dict = {item['medicine_id']: item['stock_quantity'] for item in inventory}
-            
-            # Add stock info to serialized data
-            serializer = MedicineSearchSerializer(medicines, many=True)
-            data = serializer.data
-            
-            for item in data:
-                item['stock_quantity'] = inventory_dict.get(item['id'], 0)
-                item['available_at_pharmacy'] = item['stock_quantity'] > 0
-            
-            return Response(data)
-        except Pharmacy.DoesNotExist:
-            pass
+        medicines = medicines.annotate(stock_quantity=pharmacy_stock(pharmacy_id))
+        stock_fields = ('stock_quantity',)
+        stock['available_at_pharmacy'] = ExpressionWrapper(
+            Q(stock_quantity__gt=0), output_field=BooleanField()
+        )
     
-    serializer = MedicineSearchSerializer(medicines, many=True)
-    return Response(serializer.data)
+    # Every result field, stock included, comes straight from the query
+    data = medicine_search_rows(medicines, limit, *stock_fields, **stock)
+    
+    # The rows are already plain dicts, so skip the renderer negotiation
+    return json_response(data)
 
 # Category and Manufacturer Views
-class CategoryListView(generics.ListAPIView):
+class CategoryListView(CachedListMixin, generics.ListAPIView):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    cache_name = 'categories'
 
-class ManufacturerListView(generics.ListAPIView):
+class ManufacturerListView(CachedListMixin, generics.ListAPIView):
     queryset = Manufacturer.objects.all()
     serializer_class = ManufacturerSerializer
+    cache_name = 'manufacturers'
 
 # Pharmacy Views
 class PharmacyListView(generics.ListAPIView):
@@ -104,13 +165,19 @@ def pharmacy_inventory(request, pharmacy_id):
     """Get inventory for a specific pharmacy"""
     pharmacy = get_object_or_404(Pharmacy, id=pharmacy_id, is_active=True)
     
+    # PharmacyInventorySerializer only reads the medicine's name and strength,
+    # so join just those columns rather than the whole Medicine row
     inventory = PharmacyInventory.objects.filter(
         pharmacy=pharmacy,
         stock_quantity__gt=0
-    ).select_related('medicine')
+    ).select_related('medicine').only(
+        *(field.name for field in PharmacyInventory._meta.concrete_fields),
+        'medicine__name', 'medicine__strength'
+    )
     
-    serializer = PharmacyInventorySerializer(inventory, many=True)
-    return Response(serializer.data)
+    # Stream rows from a server-side cursor rather than building the whole
+    # inventory list in memory
+    return streaming_json_response(inventory, PharmacyInventorySerializer)
 
 # Customer Views
 class CustomerCreateView(generics.CreateAPIView):
@@ -120,9 +187,8 @@ class CustomerCreateView(generics.CreateAPIView):
 @api_view(['GET', 'POST'])
 def customer_profile(request, phone_number):
     """Get or update customer profile"""
-    try:
-        customer = Customer.objects.get(phone_number=phone_number)
-    except Customer.DoesNotExist:
+    customer = Customer.objects.filter(phone_number=phone_number).first()
+    if customer is None:
         if request.method == 'POST':
             data = request.data.copy()
             data['phone_number'] = phone_number
@@ -146,8 +212,30 @@ def customer_profile(request, phone_number):
         return Response(serializer.errors, status=400)
 
 # Order Views
+# Order items with just the medicine columns OrderItemSerializer renders;
+# 'order' must stay loaded so the prefetch can attach items to their orders
+ORDER_ITEMS_PREFETCH = Prefetch(
+    'items',
+    queryset=OrderItem.objects.select_related('medicine').only(
+        'id', 'order', 'medicine', 'quantity', 'unit_price', 'total_price',
+        'medicine__name', 'medicine__strength'
+    )
+)
+
+VALID_ORDER_STATUSES = frozenset(value for value, _ in Order.STATUS_CHOICES)
+
+def order_queryset():
+    """Orders with everything OrderSerializer renders loaded up front"""
+    # Every order column, but only the customer and pharmacy columns the
+    # serializer reads rather than their full rows (addresses, hours, ...)
+    return Order.objects.select_related('customer', 'pharmacy').only(
+        *(field.name for field in Order._meta.concrete_fields),
+        'customer__name', 'customer__phone_number', 'pharmacy__name'
+    ).prefetch_related(ORDER_ITEMS_PREFETCH)
+
 class OrderListView(generics.ListAPIView):
     serializer_class = OrderSerializer
+    pagination_class = OrderPagination
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['status', 'customer', 'pharmacy']
     ordering_fields = ['created_at', 'total_amount']
@@ -156,11 +244,11 @@ class OrderListView(generics.ListAPIView):
     def get_queryset(self):
         phone_number = self.request.GET.get('phone_number')
         if phone_number:
-            return Order.objects.filter(customer__phone_number=phone_number)
-        return Order.objects.all()
+            return order_queryset().filter(customer__phone_number=phone_number)
+        return order_queryset()
 
 class OrderDetailView(generics.RetrieveAPIView):
-    queryset = Order.objects.all()
+    queryset = order_queryset()
     serializer_class = OrderSerializer
     lookup_field = 'order_id'
 
@@ -170,6 +258,7 @@ def create_quick_order(request):
     serializer = QuickOrderSerializer(data=request.data)
     if serializer.is_valid():
         order = serializer.save()
+        prefetch_related_objects([order], ORDER_ITEMS_PREFETCH)
         order_serializer = OrderSerializer(order)
         return Response(order_serializer.data, status=201)
     return Response(serializer.errors, status=400)
@@ -177,17 +266,16 @@ def create_quick_order(request):
 @api_view(['PATCH'])
 def update_order_status(request, order_id):
     """Update order status"""
-    try:
-        order = Order.objects.get(order_id=order_id)
-    except Order.DoesNotExist:
+    order = order_queryset().filter(order_id=order_id).first()
+    if order is None:
         return Response({'error': 'Order not found'}, status=404)
     
     new_status = request.data.get('status')
-    if new_status not in dict(Order.STATUS_CHOICES):
+    if new_status not in VALID_ORDER_STATUSES:
         return Response({'error': 'Invalid status'}, status=400)
     
     order.status = new_status
-    order.save()
+    order.save(update_fields=['status', 'updated_at'])
     
     serializer = OrderSerializer(order)
     return Response(serializer.data)
@@ -198,29 +286,43 @@ def whatsapp_session(request, phone_number):
     """Manage WhatsApp conversation sessions"""
     session_id = request.data.get('session_id', 'default') if request.method == 'POST' else request.GET.get('session_id', 'default')
     
-    session, created = WhatsAppSession.objects.get_or_create(
-        phone_number=phone_number,
-        session_id=session_id,
-        defaults={'current_step': 'start', 'context_data': {}}
-    )
+    store = SessionStore(phone_number, session_id)
     
     if request.method == 'GET':
-        serializer = WhatsAppSessionSerializer(session)
-        return Response(serializer.data)
+        return Response(store.load())
     
     elif request.method == 'POST':
         # Update session data
-        if 'current_step' in request.data:
-            session.current_step = request.data['current_step']
-        
-        if 'context_data' in request.data:
-            session.context_data.update(request.data['context_data'])
-        
-        session.save()
-        serializer = WhatsAppSessionSerializer(session)
-        return Response(serializer.data)
+        session = store.update(
+            current_step=request.data.get('current_step'),
+            context_data=request.data.get('context_data')
+        )
+        return Response(session)
 
 # Utility Views for WhatsApp Bot
+
+# The compiled symptom pattern of this process, keyed by catalogue version
+_symptom_patterns = {}
+_NOT_BUILT = object()
+
+def symptom_pattern():
+    """Compiled pattern finding the first known symptom in a message in a single scan
+
+    Built once per catalogue version and process; longer names win at the
+    same position.
+    """
+    version = catalog_version()
+    # A single get(), so another thread clearing the dict can't cause a KeyError
+    pattern = _symptom_patterns.get(version, _NOT_BUILT)
+    if pattern is _NOT_BUILT:
+        names = list(Symptom.objects.values_list('name', flat=True))
+        pattern = re.compile('|'.join(
+            re.escape(name) for name in sorted(names, key=len, reverse=True)
+        )) if names else None
+        _symptom_patterns.clear()
+        _symptom_patterns[version] = pattern
+    return pattern
+
 @api_view(['GET'])
 def medicine_suggestions(request):
     """Get medicine suggestions based on symptoms or conditions"""
@@ -230,30 +332,23 @@ def medicine_suggestions(request):
     if not symptom:
         return Response({'error': 'Symptom parameter is required'}, status=400)
     
-    # Simple keyword matching (in production, use more sophisticated NLP)
-    symptom_keywords = {
-        'headache': ['paracetamol', 'aspirin', 'ibuprofen'],
-        'fever': ['paracetamol', 'panadol', 'crocin'],
-        'cold': ['cetirizine', 'phenylephrine', 'paracetamol'],
-        'cough': ['dextromethorphan', 'ambroxol', 'salbutamol'],
-        'acidity': ['omeprazole', 'pantoprazole', 'ranitidine'],
-        'pain': ['ibuprofen', 'diclofenac', 'paracetamol'],
-    }
-    
     suggestions = []
-    for condition, keywords in symptom_keywords.items():
-        if condition in symptom:
+    pattern = symptom_pattern()
+    match = pattern.search(symptom) if pattern else None
+    if match:
+        condition = match.group()
+        cache_key = catalog_cache_key(f'suggestions:{condition}:{limit}')
+        suggestions = cache.get(cache_key)
+        if suggestions is None:
+            # Medicines linked to the symptom through the join table
             medicines = Medicine.objects.filter(
-                Q(name__icontains=keywords[0]) |
-                Q(generic_name__icontains=keywords[0]) |
-                Q(composition__icontains=keywords[0]),
+                symptoms__name=condition,
                 is_active=True,
                 prescription_type='OTC'  # Only suggest OTC medicines
-            )[:limit]
+            )
             
-            serializer = MedicineSearchSerializer(medicines, many=True)
-            suggestions.extend(serializer.data)
-            break
+            suggestions = medicine_search_rows(medicines, limit)
+            cache.set(cache_key, suggestions, CATALOG_CACHE_TIMEOUT)
     
     return Response(suggestions[:limit])
 